@@ -1,6 +1,8 @@
 import os
 import json
 import base64
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
@@ -128,3 +130,14 @@ class FirebaseService:
             self.db = MockFirestore()
 
 firebase_service = FirebaseService()
+
+# The admin SDK is synchronous. Every Firestore call made from a request
+# handler goes through this pool so the event loop never waits on an RPC;
+# independent reads fanned out here also overlap their round-trips.
+FIRESTORE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="firestore")
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking Firestore call on FIRESTORE_POOL and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(FIRESTORE_POOL, fn, *args)
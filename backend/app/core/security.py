@@ -0,0 +1,23 @@
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.firebase import firebase_service
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Guard for maintenance endpoints (counter rebuilds, backfills) that are
+    called by operators or a scheduler, not by the portals. Callers send
+    the shared secret from ADMIN_API_TOKEN in the X-Admin-Token header.
+    Mock mode without a configured token is left open for local use.
+    """
+    expected = os.environ.get("ADMIN_API_TOKEN")
+    if not expected:
+        if firebase_service.mock_mode:
+            return
+        raise HTTPException(status_code=503, detail="ADMIN_API_TOKEN is not configured")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -1,22 +1,54 @@
-from typing import List, Tuple
+import hashlib
+import hmac
+import logging
+import os
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+import orjson
+
+from app.core.firebase import firebase_service
+
+logger = logging.getLogger(__name__)
+
+
+def _load_hmac_key() -> Optional[bytes]:
+    key = os.environ.get("PRESCRIPTION_HMAC_KEY")
+    if key:
+        return key.encode()
+    if firebase_service.mock_mode:
+        # Local / mock runs only; never used against the real database
+        return b"dev-prescription-key"
+    logger.error("PRESCRIPTION_HMAC_KEY is not set; prescription signing is disabled")
+    return None
+
+
+_HMAC_KEY = _load_hmac_key()
+
+
+def _hmac_hex(payload: dict) -> str:
+    if _HMAC_KEY is None:
+        raise RuntimeError("PRESCRIPTION_HMAC_KEY is not configured")
+    # Canonical bytes built once and fed to a single HMAC call (OpenSSL SHA-256)
+    msg = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hmac.new(_HMAC_KEY, msg, hashlib.sha256).hexdigest()
+
+
 def generate_prescription_hash(doctor_id: str, medications: List[dict], created_at: str) -> str:
-    # Mock implementation
-    return "mock_hash_1234567890abcdef"
+    return _hmac_hex({"doctor_id": doctor_id, "medications": medications, "created_at": created_at})
 
 def verify_prescription(doctor_id: str, medications: List[dict], created_at: str, expected_hash: str) -> Tuple[bool, dict]:
-    # Mock implementation
-    return True, {
-        "is_valid": True,
+    computed = generate_prescription_hash(doctor_id, medications, created_at)
+    is_valid = hmac.compare_digest(computed.encode(), expected_hash.encode())
+    return is_valid, {
+        "is_valid": is_valid,
         "doctor_id": doctor_id,
         "medication_count": len(medications),
-        "computed_hash_prefix": "mock_hash...",
-        "expected_hash_prefix": "mock_hash...",
+        "computed_hash_prefix": computed[:12] + "...",
+        "expected_hash_prefix": expected_hash[:12] + "...",
         "verified_at": datetime.utcnow().isoformat() + "Z",
-        "verdict": "INTEGRITY_VERIFIED"
+        "verdict": "INTEGRITY_VERIFIED" if is_valid else "TAMPERED"
     }
 
 def sign_order_payload(order_payload: dict) -> str:
-    # Mock implementation
-    return "signed_payload_mock"
+    return _hmac_hex(order_payload)
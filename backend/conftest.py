@@ -0,0 +1,33 @@
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def pytest_configure(config):
+    # Stub the Firebase SDK once per process, before any test module imports
+    # the app; with no credentials the service then runs in mock mode.
+    # One mock serves all three entries; nothing checks their identities.
+    firebase_stub = MagicMock()
+    for name in ("firebase_admin", "firebase_admin.auth", "firebase_admin.firestore"):
+        sys.modules.setdefault(name, firebase_stub)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def pv2_client():
+    # The v2 router is stateless apart from the collaborators tests patch,
+    # so one app + client serves the whole session. Requests are dispatched
+    # straight into the ASGI app on the test's event loop (no portal thread).
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+    import pharmacy_v2
+
+    app = FastAPI()
+    app.include_router(pharmacy_v2.router)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
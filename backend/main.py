@@ -1,3 +1,9 @@
+from contextlib import asynccontextmanager
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+from typing import Tuple
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -13,8 +19,48 @@ from pharmacy.router import router as pharmacy_v1_router
 from pharmacy.inventory_router import router as inventory_router
 from pharmacy.reports_router import router as reports_router
 from pharmacy_v2 import router as pharmacy_v2_router
+from pharmacy import service as pharmacy_service
+from app.core.responses import ORJSONResponse
+
+def _start_log_listener() -> Tuple[QueueListener, QueueHandler]:
+    """
+    Route app logging through a queue so request handlers only enqueue
+    records; a background thread does the actual stream I/O. The root
+    handler is returned so shutdown can detach it again.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    queue_handler = QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(queue_handler)
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener, queue_handler
+
 
-app = FastAPI(title="Pharma Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    listener, queue_handler = _start_log_listener()
+    pharmacy_service.start_dashboard_listener()
+    try:
+        yield
+    finally:
+        pharmacy_service.stop_dashboard_listener()
+        # Detach before stopping so a restarted lifespan doesn't enqueue twice
+        logging.getLogger().removeHandler(queue_handler)
+        listener.stop()
+
+
+app = FastAPI(
+    title="Pharma Backend",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS Configuration
 origins = [
@@ -43,4 +89,15 @@ async def root():
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port)
+    # Every endpoint is Firebase-IO bound: uvloop + httptools cut per-request
+    # loop/parser overhead, and extra workers spread the blocking SDK calls.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        limit_concurrency=int(os.environ.get("LIMIT_CONCURRENCY", 1000)),
+        backlog=int(os.environ.get("BACKLOG", 2048)),
+    )
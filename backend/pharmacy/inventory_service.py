@@ -8,10 +8,10 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import HTTPException
-from app.core.firebase import firebase_service
+from app.core.firebase import firebase_service, run_blocking
 
 INVENTORY_COLLECTION = "pharmacy_inventory"
 
@@ -23,22 +23,20 @@ def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _ts_to_iso(dt: Optional[datetime]) -> Optional[str]:
-    if not dt:
-        return None
-    if isinstance(dt, str):
-        return dt
-    if dt.tzinfo is None:
-        return dt.isoformat() + "Z"
-    return dt.isoformat()
+def _dt_iso(dt: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 for a datetime (naive → UTC 'Z'); strings never reach here."""
+    return None if dt is None else (dt.isoformat() if dt.tzinfo else dt.isoformat() + "Z")
 
 
 # ──────────────────────────────────────────────
 # Computed flags
 # ──────────────────────────────────────────────
 
-def _enrich_item(d: dict, doc_id: str) -> dict:
-    """Attach `is_low_stock` and `is_expiring_soon` booleans."""
+def _enrich_item(d: dict, doc_id: str, now: Optional[datetime] = None) -> dict:
+    """
+    Attach `is_low_stock` and `is_expiring_soon` booleans.
+    List callers pass one `now` for the whole page instead of a clock read per row.
+    """
     quantity = d.get("quantity", 0)
     threshold = d.get("threshold", LOW_STOCK_THRESHOLD)
     expiry = d.get("expiry_date")
@@ -60,14 +58,14 @@ def _enrich_item(d: dict, doc_id: str) -> dict:
     is_low = quantity < threshold
     is_expiring = False
     if expiry:
-        is_expiring = (expiry - _now()).days < EXPIRY_WINDOW_DAYS
+        is_expiring = (expiry - (now or _now())).days < EXPIRY_WINDOW_DAYS
 
     return {
         "id": doc_id,
         "drug_name": d.get("drug_name", ""),
         "strength": d.get("strength", ""),
         "quantity": quantity,
-        "expiry_date": _ts_to_iso(expiry) if isinstance(expiry, datetime) else str(expiry) if expiry else None,
+        "expiry_date": _dt_iso(expiry) if isinstance(expiry, datetime) else str(expiry) if expiry else None,
         "batch_number": d.get("batch_number", ""),
         "threshold": threshold,
         "is_low_stock": is_low,
@@ -86,12 +84,13 @@ async def list_inventory() -> List[dict]:
             return _mock_inventory()
 
         db = firebase_service.db
-        docs = (
+        docs = await run_blocking(
             db.collection(INVENTORY_COLLECTION)
             .order_by("expiry_date")
-            .stream()
+            .get
         )
-        return [_enrich_item(doc.to_dict(), doc.id) for doc in docs]
+        now = _now()
+        return [_enrich_item(doc.to_dict(), doc.id, now) for doc in docs]
     except Exception as e:
         import traceback
         print(f"DEBUG: list_inventory error: {e}")
@@ -109,12 +108,13 @@ async def update_stock(item_id: str, new_quantity: int) -> Optional[dict]:
 
     db = firebase_service.db
     ref = db.collection(INVENTORY_COLLECTION).document(item_id)
-    doc = ref.get()
+    doc = await run_blocking(ref.get)
     if not doc.exists:
         return None
 
-    ref.update({"quantity": new_quantity})
-    updated = ref.get().to_dict()
+    threshold = doc.to_dict().get("threshold", LOW_STOCK_THRESHOLD)
+    await run_blocking(ref.update, {"quantity": new_quantity, "is_low_stock": new_quantity < threshold})
+    updated = (await run_blocking(ref.get)).to_dict()
     return _enrich_item(updated, item_id)
 
 
@@ -137,11 +137,14 @@ async def add_item(data: dict) -> dict:
         except ValueError:
             pass  # Keep as string or handle error if strict validation needed
 
+    # Denormalized so the dashboard can count low-stock rows server-side
+    data["is_low_stock"] = data.get("quantity", 0) < data.get("threshold", LOW_STOCK_THRESHOLD)
+
     # Generate a new document reference
     new_ref = db.collection(INVENTORY_COLLECTION).document()
     doc_id = new_ref.id
     
-    new_ref.set(data)
+    await run_blocking(new_ref.set, data)
     
     # Return enriched item
     return _enrich_item(data, doc_id)
@@ -157,11 +160,11 @@ async def delete_item(item_id: str) -> bool:
 
     db = firebase_service.db
     ref = db.collection(INVENTORY_COLLECTION).document(item_id)
-    doc = ref.get()
+    doc = await run_blocking(ref.get)
     if not doc.exists:
         return False
 
-    ref.delete()
+    await run_blocking(ref.delete)
     return True
 
 
@@ -175,8 +178,19 @@ async def delete_item(item_id: str) -> bool:
 
 from pharmacy.mock_data import get_initial_mock_inventory
 
-# Initialize mock inventory
-_MOCK_INVENTORY_DB = get_initial_mock_inventory()
+# Initialize mock inventory (skipped outside mock mode to keep cold starts lean)
+_MOCK_INVENTORY_DB = get_initial_mock_inventory() if firebase_service.mock_mode else []
+# id → item dict (the same objects as in the list) for O(1) stock updates
+_MOCK_INVENTORY_INDEX: Dict[str, dict] = {i["id"]: i for i in _MOCK_INVENTORY_DB}
+# Ids currently flagged low-stock; the mock dashboard reads len() instead of scanning
+_MOCK_LOW_STOCK_IDS = {i["id"] for i in _MOCK_INVENTORY_DB if i.get("is_low_stock")}
+
+
+def _mock_track_low_stock(item: dict) -> None:
+    if item["is_low_stock"]:
+        _MOCK_LOW_STOCK_IDS.add(item["id"])
+    else:
+        _MOCK_LOW_STOCK_IDS.discard(item["id"])
 
 def _mock_inventory() -> List[dict]:
     # Return directly from global state to allow updates to persist in memory
@@ -186,14 +200,15 @@ def _mock_inventory() -> List[dict]:
 def _mock_update_stock(item_id: str, new_quantity: int) -> Optional[dict]:
     print(f"[MOCK] Inventory {item_id} quantity → {new_quantity}")
     
-    for item in _MOCK_INVENTORY_DB:
-        if item["id"] == item_id:
-            item["quantity"] = new_quantity
-            item["is_low_stock"] = new_quantity < item["threshold"]
-            # Enriched return
-            return item
-            
-    return None
+    item = _MOCK_INVENTORY_INDEX.get(item_id)
+    if item is None:
+        return None
+
+    item["quantity"] = new_quantity
+    item["is_low_stock"] = new_quantity < item["threshold"]
+    _mock_track_low_stock(item)
+    # Enriched return
+    return item
 
 
 def _mock_add_item(data: dict) -> dict:
@@ -224,6 +239,8 @@ def _mock_add_item(data: dict) -> dict:
     enriched["is_expiring_soon"] = is_expiring
     
     _MOCK_INVENTORY_DB.append(enriched)
+    _MOCK_INVENTORY_INDEX[item_id] = enriched
+    _mock_track_low_stock(enriched)
     # Re-sort by expiry
     _MOCK_INVENTORY_DB.sort(key=lambda x: x.get("expiry_date") or "")
     
@@ -232,8 +249,11 @@ def _mock_add_item(data: dict) -> dict:
 
 def _mock_delete_item(item_id: str) -> bool:
     print(f"[MOCK] Deleted Inventory {item_id}")
-    initial_len = len(_MOCK_INVENTORY_DB)
+    item = _MOCK_INVENTORY_INDEX.pop(item_id, None)
+    if item is None:
+        return False
+    _MOCK_LOW_STOCK_IDS.discard(item_id)
     # Remove item from list
-    _MOCK_INVENTORY_DB[:] = [item for item in _MOCK_INVENTORY_DB if item["id"] != item_id]
-    return len(_MOCK_INVENTORY_DB) < initial_len
+    _MOCK_INVENTORY_DB.remove(item)
+    return True
 
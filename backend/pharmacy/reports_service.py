@@ -10,11 +10,13 @@ from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List
 
-from app.core.firebase import firebase_service
+from app.core.firebase import firebase_service, run_blocking
 from pharmacy.models import PrescriptionStatus
 
 ORDERS_COLLECTION = "pharmacy_orders"
 
+_COMPLETED = frozenset({PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP})
+
 # Status-to-colour mapping for the donut chart
 _STATUS_COLORS = {
     PrescriptionStatus.NEW: "#F59E0B",       # Amber
@@ -68,7 +70,11 @@ async def get_analytics_stats() -> dict:
     delivery_times = []
     total_orders = 0
 
-    docs = db.collection(ORDERS_COLLECTION).stream()
+    docs = await run_blocking(
+        db.collection(ORDERS_COLLECTION)
+        .select(["status", "total_amount", "timestamps.created_at", "timestamps.completed_at"])
+        .get
+    )
     for doc in docs:
         data = doc.to_dict()
         status = data.get("status", "")
@@ -79,7 +85,7 @@ async def get_analytics_stats() -> dict:
         total_orders += 1
         counter[status] += 1
 
-        if status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
+        if status in _COMPLETED:
             total_revenue += data.get("total_amount", 0.0)
             ts = data.get("timestamps", {})
             created = _parse_iso(str(ts.get("created_at", "")))
@@ -110,7 +116,7 @@ async def get_analytics_stats() -> dict:
 
 
 def _mock_analytics_stats() -> dict:
-    from pharmacy.service import _MOCK_ORDERS_DB
+    from pharmacy.service import _MOCK_ORDERS_DB, _MOCK_ORDER_TIMES
 
     counter: Counter = Counter()
     total_revenue = 0.0
@@ -126,11 +132,11 @@ def _mock_analytics_stats() -> dict:
         total_orders += 1
         counter[status] += 1
 
-        if status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
+        if status in _COMPLETED:
             total_revenue += order.get("total_amount", 0.0)
-            ts = order.get("timestamps", {})
-            created = _parse_iso(ts.get("created_at"))
-            completed = _parse_iso(ts.get("completed_at"))
+            times = _MOCK_ORDER_TIMES.get(order["id"], {})
+            created = times.get("created_at")
+            completed = times.get("completed_at")
             if created and completed:
                 diff_mins = (completed - created).total_seconds() / 60
                 if diff_mins > 0:
@@ -172,10 +178,11 @@ async def daily_summary(days: int = 7) -> List[dict]:
     now = _now()
     start = (now - timedelta(days=days)).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    docs = (
+    docs = await run_blocking(
         db.collection(ORDERS_COLLECTION)
+        .select(["status", "timestamps.created_at"])
         .where("timestamps.created_at", ">=", start)
-        .stream()
+        .get
     )
 
     # bucket by date
@@ -198,7 +205,7 @@ async def daily_summary(days: int = 7) -> List[dict]:
         if key in buckets:
             buckets[key]["total_orders"] += 1
             status = data.get("status", "")
-            if status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
+            if status in _COMPLETED:
                 buckets[key]["delivered"] += 1
             if status == PrescriptionStatus.NEW:
                 buckets[key]["new"] += 1
@@ -211,7 +218,7 @@ async def daily_summary(days: int = 7) -> List[dict]:
 
 def _mock_daily_summary(days: int = 7) -> List[dict]:
     """Build daily summary from the actual mock orders DB."""
-    from pharmacy.service import _MOCK_ORDERS_DB
+    from pharmacy.service import _MOCK_ORDERS_DB, _MOCK_ORDER_TIMES
 
     now = _now()
 
@@ -223,15 +230,14 @@ def _mock_daily_summary(days: int = 7) -> List[dict]:
 
     # Fill from mock DB
     for order in _MOCK_ORDERS_DB:
-        ts_str = order.get("timestamps", {}).get("created_at")
-        created = _parse_iso(ts_str)
+        created = _MOCK_ORDER_TIMES.get(order["id"], {}).get("created_at")
         if not created:
             continue
         key = created.strftime("%Y-%m-%d")
         if key in buckets:
             buckets[key]["total_orders"] += 1
             status = order.get("status")
-            if status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
+            if status in _COMPLETED:
                 buckets[key]["delivered"] += 1
             if status == PrescriptionStatus.NEW:
                 buckets[key]["new"] += 1
@@ -257,13 +263,17 @@ async def top_medicines(limit: int = 10) -> List[dict]:
     db = firebase_service.db
     counter: Counter = Counter()
 
-    for s in [PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP]:
-        docs = db.collection(ORDERS_COLLECTION).where("status", "==", s).stream()
-        for doc in docs:
-            meds = doc.to_dict().get("medications", [])
-            for m in meds:
-                name = m.get("drug_name", "Unknown")
-                counter[name] += 1
+    docs = await run_blocking(
+        db.collection(ORDERS_COLLECTION)
+        .select(["medications"])
+        .where("status", "in", list(_COMPLETED))
+        .get
+    )
+    for doc in docs:
+        meds = doc.to_dict().get("medications", [])
+        for m in meds:
+            name = m.get("drug_name", "Unknown")
+            counter[name] += 1
 
     ranked = counter.most_common(limit)
     return [{"drug_name": name, "count": count, "rank": i + 1} for i, (name, count) in enumerate(ranked)]
@@ -277,7 +287,7 @@ def _mock_top_medicines(limit: int = 10) -> List[dict]:
 
     for order in _MOCK_ORDERS_DB:
         status = order.get("status")
-        if status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
+        if status in _COMPLETED:
             for med in order.get("medications", []):
                 name = med.get("drug_name", "Unknown")
                 counter[name] += 1
@@ -12,18 +12,22 @@ Endpoints:
 
 from __future__ import annotations
 
+import logging
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+import fastjsonschema
+from fastapi import APIRouter, BackgroundTasks, Body, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
 
-from pharmacy.models import PrescriptionStatus
+from pharmacy.models import MedicationItem, PrescriptionStatus
 from pharmacy.schemas import (
     CreateOrderRequest,
     CreateOrderBridgeRequest,
     DashboardStatsResponse,
     OrderDetailResponse,
-    OrderListItem,
+    OrderListPage,
     StatusUpdateResponse,
     UpdateOrderStatusRequest,
 )
@@ -31,14 +35,26 @@ from pharmacy.schemas import (
 from pharmacy.schemas_signup import PharmacySignupRequest
 
 from pharmacy import service
-from app.core.firebase import firebase_service
+from app.core.firebase import firebase_service, run_blocking
+from app.core.security import require_admin_token
 import uuid
 from firebase_admin import auth, firestore
 import firebase_admin
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/pharmacy", tags=["Pharmacy Portal"])
 
+# Core schemas compiled once at import; hot routes validate + dump through
+# these instead of FastAPI rebuilding the response-model pipeline per call.
+_ORDER_PAGE_ADAPTER = TypeAdapter(OrderListPage)
+_STATS_ADAPTER = TypeAdapter(DashboardStatsResponse)
+
+# POST /orders validates the raw body with generated code and skips
+# Pydantic; the model is kept for the OpenAPI request schema only.
+_validate_create_order = fastjsonschema.compile(CreateOrderRequest.model_json_schema())
+
 @router.get("/")
 async def pharmacy_root():
     return {"message": "Pharmacy API is online", "endpoints": ["/stats", "/orders", "/inventory"]}
@@ -70,11 +86,11 @@ async def pharmacy_signup(req: PharmacySignupRequest):
     # 2. Firebase Auth - Create User
     try:
         app_instance = firebase_service.app or firebase_admin.get_app()
-        user = auth.create_user(
-            email=email, 
-            password=password, 
-            app=app_instance
-        )
+        user = await run_blocking(lambda: auth.create_user(
+            email=email,
+            password=password,
+            app=app_instance,
+        ))
     except auth.EmailAlreadyExistsError:
         raise HTTPException(status_code=400, detail="Email already exists")
     except Exception as e:
@@ -93,7 +109,7 @@ async def pharmacy_signup(req: PharmacySignupRequest):
     }
     
     try:
-        db.collection("pharmacies").document(pharmacy_id).set(pharmacy_data)
+        await run_blocking(db.collection("pharmacies").document(pharmacy_id).set, pharmacy_data)
 
         # 4. Create User Document with Link
         user_data = {
@@ -104,8 +120,9 @@ async def pharmacy_signup(req: PharmacySignupRequest):
             "is_verified": False,  # Block access until admin check
             "created_at": firestore.SERVER_TIMESTAMP
         }
-        db.collection("users").document(uid).set(user_data)
-        
+        await run_blocking(db.collection("users").document(uid).set, user_data)
+        service.invalidate_pharmacies_cache()
+
         return {"status": "success", "pharmacy_id": pharmacy_id, "uid": uid}
 
     except Exception as e:
@@ -132,18 +149,59 @@ async def list_verified_pharmacies(
     return pharmacies
 
 
-@router.get("/stats", response_model=DashboardStatsResponse)
-async def pharmacy_dashboard_stats():
+@router.get(
+    "/stats",
+    response_class=Response,
+    responses={200: {"model": DashboardStatsResponse}},
+)
+async def pharmacy_dashboard_stats(
+    fresh: bool = Query(
+        False,
+        description="Bypass the 30 s snapshot cache and recompute now (admin only)",
+    ),
+    x_admin_token: Optional[str] = Header(None),
+):
     """Return the 4 metric cards for the pharmacy dashboard."""
-    data = await service.get_dashboard_stats()
-    return data
+    if fresh:
+        # A forced recompute skips the cache and single-flight lock, so it
+        # takes the same X-Admin-Token as the maintenance endpoints
+        require_admin_token(x_admin_token)
+    data = await service.get_dashboard_stats(fresh=fresh)
+    return Response(
+        _STATS_ADAPTER.dump_json(_STATS_ADAPTER.validate_python(data)),
+        media_type="application/json",
+    )
+
+
+@router.post("/stats/rebuild", dependencies=[Depends(require_admin_token)])
+async def rebuild_dashboard_stats():
+    """
+    Recompute the materialized dashboard counters from the orders
+    collection. Call once after deploy and nightly (e.g. Cloud Scheduler)
+    with the `X-Admin-Token` header; see DB_SETUP.md.
+    """
+    return await service.rebuild_dashboard_counters()
+
+
+@router.post("/maintenance/backfill", dependencies=[Depends(require_admin_token)])
+async def backfill_denormalized_fields():
+    """
+    Write `medication_count` / `patient_name` onto older orders and
+    `is_low_stock` onto older inventory rows. Run once after deploy,
+    before the first stats rebuild; see DB_SETUP.md.
+    """
+    return await service.backfill_denormalized_fields()
 
 
 # ──────────────────────────────────────────────
 # 2.  Order List  (sidebar / table)
 # ──────────────────────────────────────────────
 
-@router.get("/orders", response_model=List[OrderListItem])
+@router.get(
+    "/orders",
+    response_class=Response,
+    responses={200: {"model": OrderListPage}},
+)
 async def list_pharmacy_orders(
     status: Optional[PrescriptionStatus] = Query(
         None, description="Filter by prescription status (NEW, ACCEPTED, PREPARING …)"
@@ -154,17 +212,36 @@ async def list_pharmacy_orders(
     date_to: Optional[datetime] = Query(
         None, description="End of date range (ISO-8601)"
     ),
+    page_size: int = Query(
+        service.ORDER_PAGE_SIZE, ge=1, le=service.MAX_ORDER_PAGE_SIZE,
+        description="Maximum number of orders to return",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="`next_cursor` from the previous page"
+    ),
 ):
     """
-    Paginated / filtered order list.
+    Paginated / filtered order list, newest first.
     Each item carries a **color_code** hint for the UI chip.
     """
-    orders = await service.list_orders(
+    if cursor:
+        try:
+            service.decode_order_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # The whole page is fetched and validated before any byte is sent, so a
+    # failed query or a bad row surfaces as an error status, not a torn body
+    rows = await run_blocking(lambda: list(service.iter_orders(
         status=status.value if status else None,
         date_from=date_from,
         date_to=date_to,
-    )
-    return orders
+        page_size=page_size,
+        cursor=cursor,
+    )))
+    next_cursor = service.encode_order_cursor(rows[-1]) if len(rows) == page_size else None
+    page = _ORDER_PAGE_ADAPTER.validate_python({"items": rows, "next_cursor": next_cursor})
+    return Response(_ORDER_PAGE_ADAPTER.dump_json(page), media_type="application/json")
 
 
 # ──────────────────────────────────────────────
@@ -188,15 +265,18 @@ async def get_pharmacy_order(order_id: str):
 async def update_pharmacy_order_status(
     order_id: str,
     body: UpdateOrderStatusRequest,
+    background_tasks: BackgroundTasks,
 ):
     """
     Advance an order through its lifecycle.
     Side-effects:
-      * READY     → push notification sent to patient
+      * READY     → push notification sent to patient (after the response)
       * DELIVERED  → `completed_at` timestamp recorded
       * PICKED_UP  → `completed_at` timestamp recorded
     """
-    result = await service.update_order_status(order_id, body.status)
+    result = await service.update_order_status(
+        order_id, body.status, background_tasks=background_tasks
+    )
     if result is None:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
     return result
@@ -206,10 +286,42 @@ async def update_pharmacy_order_status(
 # 5.  Create Order  (prescription → pharmacy)
 # ──────────────────────────────────────────────
 
-@router.post("/orders", response_model=dict, status_code=201)
-async def create_pharmacy_order(body: CreateOrderRequest):
+@router.post(
+    "/orders",
+    response_model=dict,
+    status_code=201,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": CreateOrderRequest.model_json_schema(
+                        ref_template="#/components/schemas/{model}"
+                    )
+                }
+            },
+        }
+    },
+)
+async def create_pharmacy_order(request: Request):
     """Accept a new prescription from the doctor / agent flow."""
-    meds = [m.dict() for m in body.medications]
+    try:
+        raw = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Request body is not valid JSON")
+    # Only value errors carry a path; anything else (a broken schema) propagates
+    try:
+        _validate_create_order(raw)
+    except fastjsonschema.JsonSchemaValueException as e:
+        # fastjsonschema reports array indices as strings; FastAPI uses ints
+        loc = ["body", *(int(p) if p.isdigit() else p for p in e.path[1:])]
+        raise HTTPException(
+            status_code=422,
+            detail=[{"type": "json_schema", "loc": loc, "msg": e.message}],
+        )
+
+    body = CreateOrderRequest.model_construct(**raw)
+    meds = [MedicationItem.model_construct(**m).model_dump() for m in body.medications]
     result = await service.create_order(
         patient_name=body.patient_name,
         patient_age=body.patient_age,
@@ -227,6 +339,106 @@ async def create_pharmacy_order(body: CreateOrderRequest):
 # 6.  Prescription Bridge
 # ──────────────────────────────────────────────
 
+def _age_from_dob(dob_str: str) -> int:
+    """
+    Whole years since an ISO-8601 date of birth (YYYY-MM-DD...). Year-only
+    values fall back to a year difference; anything unparseable yields 0
+    so one bad profile never fails the order.
+    """
+    today = datetime.utcnow().date()
+    try:
+        dob = datetime.fromisoformat(dob_str[:10]).date()
+    except (TypeError, ValueError):
+        try:
+            return today.year - int(dob_str[:4])
+        except (TypeError, ValueError):
+            logger.warning("Unparseable profile dob %r; using age 0", dob_str)
+            return 0
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+
+# Firestore caps a WriteBatch at 500 operations.
+_MAX_BATCH_WRITES = 500
+# One slot per batch is kept for the stats counter bump
+_MAX_BULK_ORDERS = _MAX_BATCH_WRITES - 1
+
+
+def _needs_profile(order_req: CreateOrderBridgeRequest) -> bool:
+    """True when the request lacks the patient fields the order needs."""
+    return order_req.patient_name is None or order_req.patient_age is None
+
+
+def _build_bridge_order(order_req: CreateOrderBridgeRequest, profile: Optional[dict]) -> dict:
+    """Adapt a bridge request (+ optional profile doc) to the Pharmacy Portal order schema."""
+    # 1. Patient snapshot from the profile (for Name/Age)
+    patient_name = "Unknown Patient"
+    patient_age = 0
+    patient_gender = "Unknown"
+
+    if profile:
+        patient_name = profile.get("full_name", patient_name)
+        patient_gender = profile.get("gender", patient_gender)
+        # Prefer the age denormalized onto the profile; only
+        # derive it from DOB for profiles written before that.
+        if profile.get("age_years") is not None:
+            patient_age = profile["age_years"]
+        elif profile.get("dob"):
+            patient_age = _age_from_dob(profile["dob"])
+
+    # Values sent by the patient portal take precedence over the profile
+    if order_req.patient_name is not None:
+        patient_name = order_req.patient_name
+    if order_req.patient_age is not None:
+        patient_age = order_req.patient_age
+    if order_req.patient_gender is not None:
+        patient_gender = order_req.patient_gender
+
+    # 2. Structure for Pharmacy Portal (matches service.py schema)
+    order_id = service.new_order_id()
+
+    # Simplified medication mapping
+    meds = []
+    for item in order_req.items:
+        meds.append({
+            "drug_name": item.get("drug_name", "Unknown Drug"),
+            "strength": item.get("strength", "N/A"),
+            "frequency": item.get("frequency", "N/A"),
+            "duration": item.get("duration", "N/A"),
+            "instructions": item.get("instructions", "N/A"),
+            "quantity": item.get("quantity", 1)
+        })
+
+    return {
+        "order_id": order_id,
+        "patient_info": {
+            "name": patient_name,
+            "age": patient_age,
+            "gender": patient_gender,
+            "contact_id": order_req.profile_id
+        },
+        "doctor_info": {
+            "name": "Dr. Assigned",
+            "registration_id": "REG-000"
+        },
+        "medications": meds,
+        "medication_count": len(meds),
+        "patient_name": patient_name,
+        "status": "NEW",
+        "delivery_mode": "STORE_PICKUP",
+        "timestamps": {
+            "created_at": firestore.SERVER_TIMESTAMP,
+            "accepted_at": None,
+            "ready_at": None,
+            "completed_at": None
+        },
+        # Bridge specific fields
+        "case_id": order_req.case_id,
+        "profile_id": order_req.profile_id,
+        "pharmacy_id": order_req.pharmacy_id,
+        "delivery_location": order_req.location
+    }
+
+
 @router.post("/create_order")
 async def create_order_from_prescription(order_req: CreateOrderBridgeRequest):
     """
@@ -234,78 +446,77 @@ async def create_order_from_prescription(order_req: CreateOrderBridgeRequest):
     Adapts the request to the Pharmacy Portal schema (v2) while keeping v1 IDs.
     """
     try:
-        # 1. Fetch Profile Data (for Name/Age)
-        patient_name = "Unknown Patient"
-        patient_age = 0
-        patient_gender = "Unknown"
-        
-        if not firebase_service.mock_mode:
+        profile = None
+        if not firebase_service.mock_mode and _needs_profile(order_req):
             try:
-                doc = firebase_service.db.collection("profiles").document(order_req.profile_id).get()
+                doc = await run_blocking(
+                    firebase_service.db.collection("profiles").document(order_req.profile_id).get
+                )
                 if doc.exists:
-                    p_data = doc.to_dict()
-                    patient_name = p_data.get("full_name", patient_name)
-                    patient_gender = p_data.get("gender", patient_gender)
-                    # Calculate age from DOB if available
-                    dob_str = p_data.get("dob")
-                    if dob_str:
-                        # Simple year diff
-                        dob_year = int(dob_str[:4])
-                        patient_age = datetime.utcnow().year - dob_year
+                    profile = doc.to_dict()
             except Exception as e:
-                print(f"Profile Fetch Warning: {e}")
-
-        # 2. Structure for Pharmacy Portal (matches service.py schema)
-        now = datetime.utcnow()
-        order_id = f"RX-{uuid.uuid4().hex[:8].upper()}"
-        
-        # Simplified medication mapping
-        meds = []
-        for item in order_req.items:
-            meds.append({
-                "drug_name": item.get("drug_name", "Unknown Drug"),
-                "strength": item.get("strength", "N/A"),
-                "frequency": item.get("frequency", "N/A"),
-                "duration": item.get("duration", "N/A"),
-                "instructions": item.get("instructions", "N/A"),
-                "quantity": item.get("quantity", 1)
-            })
-
-        new_order = {
-            "order_id": order_id,
-            "patient_info": {
-                "name": patient_name,
-                "age": patient_age,
-                "gender": patient_gender,
-                "contact_id": order_req.profile_id
-            },
-            "doctor_info": {
-                "name": "Dr. Assigned",
-                "registration_id": "REG-000"
-            },
-            "medications": meds,
-            "status": "NEW",
-            "delivery_mode": "STORE_PICKUP",
-            "timestamps": {
-                "created_at": now,
-                "accepted_at": None,
-                "ready_at": None,
-                "completed_at": None
-            },
-            # Bridge specific fields
-            "case_id": order_req.case_id,
-            "profile_id": order_req.profile_id,
-            "pharmacy_id": order_req.pharmacy_id,
-            "delivery_location": order_req.location
-        }
-        
+                logger.warning("Profile fetch failed for %s: %s", order_req.profile_id, e)
+
+        new_order = _build_bridge_order(order_req, profile)
+        order_id = new_order["order_id"]
+
         # Save directly to 'pharmacy_orders'
         if not firebase_service.mock_mode:
-            firebase_service.db.collection("pharmacy_orders").document(order_id).set(new_order)
+            db = firebase_service.db
+            batch = db.batch()
+            batch.set(db.collection("pharmacy_orders").document(order_id), new_order)
+            service.record_orders_created(batch, 1)
+            await run_blocking(batch.commit)
+            service.invalidate_dashboard_stats()
         else:
-            print(f"[MOCK] Bridge Created Order: {new_order}")
+            logger.info("[MOCK] Bridge created order %s", order_id)
 
         return {"status": "success", "order_id": order_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.post("/create_orders")
+async def create_orders_from_prescriptions(
+    order_reqs: List[CreateOrderBridgeRequest] = Body(..., max_length=_MAX_BULK_ORDERS),
+):
+    """
+    Batch variant of the bridge for back-to-back orders.
+    All referenced profiles are fetched in one `get_all` round trip and
+    the orders plus their stats counter bump are written in a single batch
+    commit, so a request is stored all-or-nothing and a failed call can be
+    retried without duplicating orders. Larger requests are rejected (422).
+    """
+    try:
+        profiles: dict = {}
+        missing = [r.profile_id for r in order_reqs if _needs_profile(r)]
+        if not firebase_service.mock_mode and missing:
+            db = firebase_service.db
+            try:
+                refs = [
+                    db.collection("profiles").document(pid)
+                    for pid in dict.fromkeys(missing)
+                ]
+                # get_all does not preserve request order, so key by doc id
+                snaps = await run_blocking(lambda: list(db.get_all(refs)))
+                profiles = {snap.id: snap.to_dict() for snap in snaps if snap.exists}
+            except Exception as e:
+                logger.warning("Bulk profile fetch failed: %s", e)
+
+        new_orders = [_build_bridge_order(r, profiles.get(r.profile_id)) for r in order_reqs]
+
+        if not firebase_service.mock_mode:
+            db = firebase_service.db
+            orders_col = db.collection("pharmacy_orders")
+            batch = db.batch()
+            for order in new_orders:
+                batch.set(orders_col.document(order["order_id"]), order)
+            service.record_orders_created(batch, len(new_orders))
+            await run_blocking(batch.commit)
+            service.invalidate_dashboard_stats()
+        else:
+            logger.info("[MOCK] Bridge created %d orders", len(new_orders))
+
+        return {"status": "success", "order_ids": [o["order_id"] for o in new_orders]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
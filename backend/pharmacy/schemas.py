@@ -3,6 +3,7 @@ Request / Response schemas for Pharmacy Portal API endpoints.
 Thin wrappers around the core models to separate API concerns.
 """
 
+from datetime import datetime
 from typing import List, Optional
 
 from pydantic import BaseModel, Field
@@ -37,6 +38,11 @@ class CreateOrderBridgeRequest(BaseModel):
     pharmacy_id: str
     items: List[dict]  # Simplified for flexibility, or use specialized MedicationItem if strict
     location: str
+    # Optional patient snapshot; the patient portal already has the profile
+    # loaded, and sending it here saves the bridge a Firestore read.
+    patient_name: Optional[str] = None
+    patient_age: Optional[int] = None
+    patient_gender: Optional[str] = None
 
 
 class PharmacyListItem(BaseModel):
@@ -83,10 +89,16 @@ class OrderListItem(BaseModel):
         ..., description="UI chip colour: teal | blue | amber | green | gray"
     )
     medication_count: int
-    created_at: Optional[str] = None  # ISO-8601
-    accepted_at: Optional[str] = None
-    ready_at: Optional[str] = None
-    completed_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+    accepted_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+
+class OrderListPage(BaseModel):
+    """One page of ``OrderListItem`` rows plus the cursor for the next page."""
+    items: List[OrderListItem]
+    next_cursor: Optional[str] = None  # None on the last page
 
 
 class OrderSummary(BaseModel):
@@ -114,10 +126,10 @@ class OrderDetailResponse(BaseModel):
     color_code: Optional[str] = None
     delivery_mode: DeliveryMode
     total_amount: float = 0.0
-    created_at: Optional[str] = None
-    accepted_at: Optional[str] = None
-    ready_at: Optional[str] = None
-    completed_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+    accepted_at: Optional[datetime] = None
+    ready_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
 
 
 # Status update confirmation --------------------------------------
@@ -1,8 +1,11 @@
 from typing import List, Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, constr
+
+# Shape check only; Firebase Auth is the source of truth for email validity.
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
 
 class PharmacySignupRequest(BaseModel):
-    email: EmailStr
+    email: constr(pattern=EMAIL_PATTERN)
     password: str
     pharmacy_name: str
     license_no: str
@@ -8,11 +8,18 @@ notification triggers).
 
 from __future__ import annotations
 
-import uuid
+import asyncio
+import base64
+import secrets
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
 
-from app.core.firebase import firebase_service
+from fastapi import BackgroundTasks
+from firebase_admin import firestore
+
+from app.core.cache import TTLCache
+from app.core.firebase import firebase_service, run_blocking
 from pharmacy.models import (
     DeliveryMode,
     DoctorInfo,
@@ -27,6 +34,18 @@ from pharmacy.models import (
 ORDERS_COLLECTION = "pharmacy_orders"
 INVENTORY_COLLECTION = "pharmacy_inventory"
 
+# Materialized dashboard counters, kept up to date by order writes:
+#   in_progress          – ACCEPTED + PREPARING orders
+#   new_by_day.{date}    – orders created on {date} that are still NEW
+#   completed_by_day.{date} – orders DELIVERED / PICKED_UP on {date}
+# Day-keyed maps mean "today" rolls over without a reset job.
+STATS_COLLECTION = "pharmacy_stats"
+STATS_DOC_ID = "today"
+
+# Status buckets behind the dashboard counters
+_IN_PROGRESS = frozenset({PrescriptionStatus.ACCEPTED, PrescriptionStatus.PREPARING})
+_COMPLETED = frozenset({PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP})
+
 # ──────────────────────────────────────────────
 # Status → UI chip colour mapping (used by the list endpoint)
 # ──────────────────────────────────────────────
@@ -39,6 +58,7 @@ STATUS_COLOR_MAP: Dict[str, str] = {
     PrescriptionStatus.PICKED_UP: "gray",
     PrescriptionStatus.REJECTED: "red",
 }
+_color_for = STATUS_COLOR_MAP.get
 
 
 def _now() -> datetime:
@@ -50,16 +70,25 @@ def _start_of_today() -> datetime:
     return now.replace(hour=0, minute=0, second=0, microsecond=0)
 
 
+def _dt_iso(dt: Optional[datetime]) -> Optional[str]:
+    """ISO-8601 for a datetime known not to be a string (naive → UTC 'Z')."""
+    return None if dt is None else (dt.isoformat() if dt.tzinfo else dt.isoformat() + "Z")
+
+
 def _ts_to_iso(dt: Optional[datetime]) -> Optional[str]:
-    if not dt:
+    # Only for values that may be strings (mock data, legacy docs); use _dt_iso otherwise
+    if dt is None:
         return None
-    # If it's already a string (Firestore sometimes returns strings for Timestamps if not converted), return as is
-    if isinstance(dt, str):
-        return dt
-    if dt.tzinfo is None:
-        # Assume UTC if naive
-        return dt.isoformat() + "Z"
-    return dt.isoformat()
+    # Firestore sometimes hands back strings for Timestamps if not converted; return as is
+    if type(dt) is str:
+        return dt or None
+    # Assume UTC if naive
+    return dt.isoformat() + "Z" if dt.tzinfo is None else dt.isoformat()
+
+
+def _count(query) -> int:
+    """Server-side COUNT aggregation – one integer over the wire, not N docs."""
+    return query.count().get()[0][0].value
 
 
 # ──────────────────────────────────────────────
@@ -71,6 +100,19 @@ def _ts_to_iso(dt: Optional[datetime]) -> Optional[str]:
 # 1.a  Pharmacy Listing (for Patient Portal)
 # ──────────────────────────────────────────────
 
+# Verified pharmacies change on an admin timescale (verification is a manual
+# step), so the whole list is cached once per worker and shared by every
+# patient page-load regardless of location.
+PHARMACIES_TTL = 300
+_pharmacies_cache = TTLCache(maxsize=1, ttl=PHARMACIES_TTL)
+_PHARMACY_LIST_FIELDS = ["name", "location", "is_verified", "rating"]
+
+
+def invalidate_pharmacies_cache() -> None:
+    """Drop cached pharmacy listings (call after a pharmacy is created / verified)."""
+    _pharmacies_cache.clear()
+
+
 async def list_pharmacies(lat: Optional[float] = None, lng: Optional[float] = None) -> List[dict]:
     """
     Returns a list of verified pharmacies for the patient to choose from.
@@ -79,9 +121,18 @@ async def list_pharmacies(lat: Optional[float] = None, lng: Optional[float] = No
     if firebase_service.mock_mode:
         return _mock_pharmacy_list()
 
+    cached = _pharmacies_cache.get("verified")
+    if cached is not None:
+        return cached
+
     db = firebase_service.db
-    # Filter only verified pharmacies
-    docs = db.collection("pharmacies").where("is_verified", "==", True).stream()
+    # Filter only verified pharmacies, projecting just the card fields
+    docs = await run_blocking(
+        db.collection("pharmacies")
+        .select(_PHARMACY_LIST_FIELDS)
+        .where("is_verified", "==", True)
+        .get
+    )
     
     results = []
     for doc in docs:
@@ -93,7 +144,8 @@ async def list_pharmacies(lat: Optional[float] = None, lng: Optional[float] = No
             "is_verified": d.get("is_verified", False),
             "rating": d.get("rating", 0.0)
         })
-    
+
+    _pharmacies_cache.set("verified", results)
     return results
 
 def _mock_pharmacy_list():
@@ -103,116 +155,327 @@ def _mock_pharmacy_list():
     ]
 
 
-async def get_dashboard_stats() -> dict:
+def _count_low_stock(db) -> int:
+    """Inventory rows flagged low-stock (flag maintained by inventory writes)."""
+    return _count(db.collection(INVENTORY_COLLECTION).where("is_low_stock", "==", True))
+
+
+# The dashboard polls every ~30 s; serve repeat polls from memory and drop
+# the snapshot whenever this worker writes an order.
+STATS_TTL = 30
+_stats_cache = TTLCache(maxsize=1, ttl=STATS_TTL)
+# Single-flight: on a miss only one coroutine recomputes, the rest wait for it
+_stats_lock = asyncio.Lock()
+
+
+def invalidate_dashboard_stats() -> None:
+    _stats_cache.clear()
+
+
+def _day_key(dt) -> Optional[str]:
+    """UTC calendar day ('YYYY-MM-DD') of a datetime or ISO-8601 string."""
+    if not dt:
+        return None
+    if isinstance(dt, str):
+        return dt[:10]
+    return dt.strftime("%Y-%m-%d")
+
+
+def _stats_ref(db):
+    return db.collection(STATS_COLLECTION).document(STATS_DOC_ID)
+
+
+def record_orders_created(batch, count: int = 1) -> None:
     """
-    Returns the 4 metric cards for the pharmacy dashboard.
-    Falls back to mock data when Firebase is in mock mode.
+    Queue today's NEW counter bump on `batch` so it commits in the same
+    RPC as the `count` order writes it accounts for. The caller commits
+    and then calls `invalidate_dashboard_stats()`.
     """
-    if firebase_service.mock_mode:
-        return _mock_dashboard_stats()
+    batch.set(
+        _stats_ref(firebase_service.db),
+        {"new_by_day": {_day_key(_now()): firestore.Increment(count)}},
+        merge=True,
+    )
 
-    db = firebase_service.db
-    today_start = _start_of_today()
 
-    # -- New prescriptions today --
-    new_today_q = (
+def _status_change_deltas(order: dict, new_status: str, now: datetime) -> dict:
+    """Counter increments that move `order` from its current bucket to `new_status`."""
+    old_status = order.get("status")
+    ts = order.get("timestamps", {})
+    created_day = _day_key(ts.get("created_at"))
+    completed_day = _day_key(ts.get("completed_at"))
+
+    in_progress = 0
+    new_by_day: Counter = Counter()
+    completed_by_day: Counter = Counter()
+
+    if created_day:
+        if old_status == PrescriptionStatus.NEW:
+            new_by_day[created_day] -= 1
+        if new_status == PrescriptionStatus.NEW:
+            new_by_day[created_day] += 1
+    if old_status in _IN_PROGRESS:
+        in_progress -= 1
+    if new_status in _IN_PROGRESS:
+        in_progress += 1
+    if old_status in _COMPLETED and completed_day:
+        completed_by_day[completed_day] -= 1
+    if new_status in _COMPLETED:
+        completed_by_day[_day_key(now)] += 1
+
+    deltas: dict = {}
+    if in_progress:
+        deltas["in_progress"] = firestore.Increment(in_progress)
+    for field, counts in (("new_by_day", new_by_day), ("completed_by_day", completed_by_day)):
+        changed = {day: firestore.Increment(n) for day, n in counts.items() if n}
+        if changed:
+            deltas[field] = changed
+    return deltas
+
+
+def _count_new_today(db) -> int:
+    return _count(
         db.collection(ORDERS_COLLECTION)
         .where("status", "==", PrescriptionStatus.NEW)
-        .where("timestamps.created_at", ">=", today_start)
-        .stream()
+        .where("timestamps.created_at", ">=", _start_of_today())
+    )
+
+
+def _count_in_progress(db) -> int:
+    return _count(
+        db.collection(ORDERS_COLLECTION)
+        .where("status", "in", list(_IN_PROGRESS))
     )
-    new_prescriptions_today = sum(1 for _ in new_today_q)
-
-    # -- In-progress (ACCEPTED + PREPARING) --
-    in_progress_statuses = [PrescriptionStatus.ACCEPTED, PrescriptionStatus.PREPARING]
-    in_progress_count = 0
-    for s in in_progress_statuses:
-        docs = db.collection(ORDERS_COLLECTION).where("status", "==", s).stream()
-        in_progress_count += sum(1 for _ in docs)
-
-    # -- Delivered / picked-up today --
-    completed_count = 0
-    for s in [PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP]:
-        docs = (
-            db.collection(ORDERS_COLLECTION)
-            .where("status", "==", s)
-            .where("timestamps.completed_at", ">=", today_start)
-            .stream()
-        )
-        completed_count += sum(1 for _ in docs)
 
-    # -- Low stock alerts --
-    low_stock_count = 0
-    try:
-        inv_docs = db.collection(INVENTORY_COLLECTION).stream()
-        for doc in inv_docs:
-            d = doc.to_dict()
-            if d.get("quantity", 0) < d.get("threshold", 10):
-                low_stock_count += 1
-    except Exception:
-        low_stock_count = 0
 
+def _count_completed_today(db) -> int:
+    return _count(
+        db.collection(ORDERS_COLLECTION)
+        .where("status", "in", list(_COMPLETED))
+        .where("timestamps.completed_at", ">=", _start_of_today())
+    )
+
+
+async def _aggregate_order_counts(db) -> Dict[str, int]:
+    """Count the order buckets straight from `pharmacy_orders` (slow path)."""
+    # Self-contained blocking helpers, run side by side on the executor
+    new_today, in_progress, delivered_today = await asyncio.gather(
+        run_blocking(_count_new_today, db),
+        run_blocking(_count_in_progress, db),
+        run_blocking(_count_completed_today, db),
+    )
     return {
-        "new_prescriptions_today": new_prescriptions_today,
-        "orders_in_progress": in_progress_count,
-        "orders_delivered_today": completed_count,
-        "low_stock_alerts": low_stock_count,
+        "new_prescriptions_today": new_today,
+        "orders_in_progress": in_progress,
+        "orders_delivered_today": delivered_today,
     }
 
 
+async def get_dashboard_stats(fresh: bool = False) -> dict:
+    """
+    Returns the 4 metric cards for the pharmacy dashboard.
+    Reads the materialized counters doc; falls back to aggregation
+    queries until that doc has been seeded. `fresh` skips the cache.
+    Falls back to mock data when Firebase is in mock mode.
+    """
+    if firebase_service.mock_mode:
+        return _mock_dashboard_stats()
+
+    if not fresh:
+        cached = _stats_cache.get("stats")
+        if cached is not None:
+            return cached
+
+    async with _stats_lock:
+        # Another request may have refilled the cache while we waited
+        if not fresh:
+            cached = _stats_cache.get("stats")
+            if cached is not None:
+                return cached
+        stats = await _compute_dashboard_stats(firebase_service.db)
+        _stats_cache.set("stats", stats)
+    return stats
+
+
+def _seeded(counters: Optional[dict]) -> Optional[dict]:
+    """
+    The counters doc only holds every bucket once a rebuild has seeded it;
+    order writes before that create it with `new_by_day` alone.
+    """
+    return counters if counters and "rebuilt_at" in counters else None
+
+
+async def _compute_dashboard_stats(db) -> dict:
+    counters = _seeded(_live_counters)
+    if counters is None:
+        # Listener not primed (or not running): read the counters doc once
+        snapshot, low_stock_count = await asyncio.gather(
+            run_blocking(_stats_ref(db).get),
+            run_blocking(_count_low_stock, db),
+        )
+        counters = _seeded(snapshot.to_dict()) if snapshot.exists else None
+    else:
+        low_stock_count = await run_blocking(_count_low_stock, db)
+
+    if counters is not None:
+        today = _day_key(_now())
+        counts = {
+            "new_prescriptions_today": counters.get("new_by_day", {}).get(today, 0),
+            "orders_in_progress": counters.get("in_progress", 0),
+            "orders_delivered_today": counters.get("completed_by_day", {}).get(today, 0),
+        }
+    else:
+        counts = await _aggregate_order_counts(db)
+
+    return {**counts, "low_stock_alerts": low_stock_count}
+
+
+# Live copy of the counters doc, kept current by a snapshot listener so the
+# dashboard skips the per-request document read. None until the first snapshot.
+_live_counters: Optional[dict] = None
+_stats_watch = None
+# Event loop that owns _stats_cache; the watch thread hands invalidation back to it
+_stats_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _on_stats_snapshot(docs, changes, read_time) -> None:
+    # Runs on the listener's thread; a single reference swap is safe to race,
+    # but TTLCache is not, so the cache is cleared on the loop instead
+    global _live_counters
+    snapshot = docs[0] if docs else None
+    _live_counters = snapshot.to_dict() if snapshot is not None and snapshot.exists else None
+    loop = _stats_loop
+    if loop is not None and not loop.is_closed():
+        loop.call_soon_threadsafe(invalidate_dashboard_stats)
+
+
+def start_dashboard_listener() -> None:
+    """
+    Subscribe to the counters doc (once per process); no-op in mock mode.
+    Call from the app's event loop (the lifespan).
+    """
+    global _stats_watch, _stats_loop
+    if firebase_service.mock_mode or _stats_watch is not None:
+        return
+    _stats_loop = asyncio.get_running_loop()
+    _stats_watch = _stats_ref(firebase_service.db).on_snapshot(_on_stats_snapshot)
+
+
+def stop_dashboard_listener() -> None:
+    global _stats_watch, _stats_loop, _live_counters
+    if _stats_watch is not None:
+        _stats_watch.unsubscribe()
+        _stats_watch = None
+    _stats_loop = None
+    _live_counters = None
+
+
+async def rebuild_dashboard_counters() -> dict:
+    """
+    Recompute the counters doc from `pharmacy_orders`.
+    Seeds the doc on first deploy and, run nightly, drops past day keys
+    and repairs any drift.
+    """
+    if firebase_service.mock_mode:
+        return _mock_dashboard_stats()
+
+    db = firebase_service.db
+    counts = await _aggregate_order_counts(db)
+    today = _day_key(_now())
+    await run_blocking(_stats_ref(db).set, {
+        "in_progress": counts["orders_in_progress"],
+        "new_by_day": {today: counts["new_prescriptions_today"]},
+        "completed_by_day": {today: counts["orders_delivered_today"]},
+        "rebuilt_at": firestore.SERVER_TIMESTAMP,
+    })
+    invalidate_dashboard_stats()
+    return counts
+
+
+# Firestore caps a WriteBatch at 500 operations.
+_BACKFILL_BATCH_WRITES = 500
+
+
+def _backfill_collection(db, collection: str, fields: List[str], patch_for) -> int:
+    """
+    Stream `collection` (projected to `fields`) and write `patch_for(doc)`
+    onto every document that returns a non-empty patch. Returns the count.
+    """
+    batch, pending, updated = db.batch(), 0, 0
+    for doc in db.collection(collection).select(fields).stream():
+        patch = patch_for(doc.to_dict())
+        if not patch:
+            continue
+        batch.update(doc.reference, patch)
+        pending += 1
+        updated += 1
+        if pending == _BACKFILL_BATCH_WRITES:
+            batch.commit()
+            batch, pending = db.batch(), 0
+    if pending:
+        batch.commit()
+    return updated
+
+
+def _order_backfill_patch(d: dict) -> dict:
+    patch = {}
+    if "medication_count" not in d:
+        patch["medication_count"] = len(d.get("medications", []))
+    patient = d.get("patient_info", {}).get("name")
+    if "patient_name" not in d and patient is not None:
+        patch["patient_name"] = patient
+    return patch
+
+
+def _inventory_backfill_patch(d: dict) -> dict:
+    from pharmacy.inventory_service import LOW_STOCK_THRESHOLD
+
+    if "is_low_stock" in d:
+        return {}
+    return {"is_low_stock": d.get("quantity", 0) < d.get("threshold", LOW_STOCK_THRESHOLD)}
+
+
+async def backfill_denormalized_fields() -> dict:
+    """
+    One-off (idempotent) backfill of the fields list/count queries rely on
+    for docs written before they existed: `medication_count` and
+    `patient_name` on orders, `is_low_stock` on inventory.
+    """
+    if firebase_service.mock_mode:
+        return {"orders_updated": 0, "inventory_updated": 0}
+
+    db = firebase_service.db
+    orders_updated, inventory_updated = await asyncio.gather(
+        run_blocking(
+            _backfill_collection, db, ORDERS_COLLECTION,
+            ["medications", "medication_count", "patient_name", "patient_info.name"],
+            _order_backfill_patch,
+        ),
+        run_blocking(
+            _backfill_collection, db, INVENTORY_COLLECTION,
+            ["quantity", "threshold", "is_low_stock"],
+            _inventory_backfill_patch,
+        ),
+    )
+    invalidate_dashboard_stats()
+    return {"orders_updated": orders_updated, "inventory_updated": inventory_updated}
+
+
 def _mock_dashboard_stats() -> dict:
     """Deterministic mock data so the frontend always has something to render."""
-    today = _start_of_today()
-    
     # Import mock inventory from inventory service to check low stock
     try:
-        from pharmacy.inventory_service import _MOCK_INVENTORY_DB
-        low_stock_count = sum(1 for item in _MOCK_INVENTORY_DB if item.get("is_low_stock", False))
+        from pharmacy.inventory_service import _MOCK_LOW_STOCK_IDS
+        low_stock_count = len(_MOCK_LOW_STOCK_IDS)
     except ImportError:
         low_stock_count = 2 # Fallback
-        
-    new_prescriptions_today = 0
-    orders_in_progress = 0
-    orders_delivered_today = 0
-    
-    for order in _MOCK_ORDERS_DB:
-        status = order.get("status")
-        created_at_str = order.get("timestamps", {}).get("created_at")
-        completed_at_str = order.get("timestamps", {}).get("completed_at")
-        
-        # Parse dates (naive/simple check)
-        created_at = None
-        if created_at_str:
-             try:
-                created_at = datetime.fromisoformat(created_at_str.replace("Z", "+00:00"))
-                if created_at.tzinfo: created_at = created_at.replace(tzinfo=None) # Compare naive
-             except: pass
-             
-        completed_at = None
-        if completed_at_str:
-            try:
-                completed_at = datetime.fromisoformat(completed_at_str.replace("Z", "+00:00"))
-                if completed_at.tzinfo: completed_at = completed_at.replace(tzinfo=None)
-            except: pass
-
-        # New Today
-        if status == PrescriptionStatus.NEW:
-            if created_at and created_at >= today:
-                new_prescriptions_today += 1
-                
-        # In Progress
-        if status in [PrescriptionStatus.ACCEPTED, PrescriptionStatus.PREPARING]:
-            orders_in_progress += 1
-            
-        # Delivered Today
-        if status in [PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP]:
-            if completed_at and completed_at >= today:
-                orders_delivered_today += 1
 
+    # Order buckets are maintained on every mock write (see _mock_count_order)
+    today = _day_key(_now())
     return {
-        "new_prescriptions_today": new_prescriptions_today,
-        "orders_in_progress": orders_in_progress,
-        "orders_delivered_today": orders_delivered_today,
+        "new_prescriptions_today": _MOCK_STATS["new_by_day"][today],
+        "orders_in_progress": _MOCK_STATS["in_progress"],
+        "orders_delivered_today": _MOCK_STATS["completed_by_day"][today],
         "low_stock_alerts": low_stock_count,
     }
 
@@ -225,20 +488,87 @@ def _mock_dashboard_stats() -> dict:
 # 2.  Order Listing  (with status / date filter)
 # ──────────────────────────────────────────────
 
-async def list_orders(
+# Fields the list view needs; `medications` itself is left on the server.
+_ORDER_LIST_FIELDS = [
+    "status",
+    "patient_name",
+    "patient_info.name",  # legacy docs without patient_name; drop once backfilled
+    "medication_count",
+    "timestamps.created_at",
+    "timestamps.accepted_at",
+    "timestamps.ready_at",
+    "timestamps.completed_at",
+]
+
+
+def _medication_count(d: dict) -> int:
+    """Stored count, or len(medications) for docs written before it existed."""
+    count = d.get("medication_count")
+    if count is None:
+        count = len(d.get("medications", []))
+    return count
+
+
+def _order_list_row(order_id: str, d: dict) -> dict:
+    """Shape a stored order into an ``OrderListItem``-compatible row."""
+    # Called once per row: bind bound methods to locals up front.
+    # Timestamps are passed through raw; the response layer encodes them.
+    ts_get = d.get("timestamps", {}).get
+    s = d.get("status", PrescriptionStatus.NEW)
+    return {
+        "id": order_id,
+        "patient_name": d.get("patient_name") or d.get("patient_info", {}).get("name", "—"),
+        "status": s,
+        "color_code": _color_for(s, "gray"),
+        "medication_count": _medication_count(d),
+        "created_at": ts_get("created_at"),
+        "accepted_at": ts_get("accepted_at"),
+        "ready_at": ts_get("ready_at"),
+        "completed_at": ts_get("completed_at"),
+    }
+
+
+# List pages are keyed on (created_at, doc id) so ties on created_at never
+# drop or repeat rows between pages.
+ORDER_PAGE_SIZE = 50
+MAX_ORDER_PAGE_SIZE = 200
+
+
+def encode_order_cursor(row: dict) -> str:
+    """Opaque cursor pointing just past ``row`` in created_at DESC order."""
+    raw = f"{_ts_to_iso(row['created_at']) or ''}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_order_cursor(cursor: str) -> tuple:
+    """Inverse of ``encode_order_cursor``; raises ValueError on a bad cursor."""
+    try:
+        created_at, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at.replace("Z", "+00:00")), order_id
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def iter_orders(
     status: Optional[str] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
-) -> List[dict]:
+    page_size: int = ORDER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Iterator[dict]:
     """
-    Returns lightweight order summaries for the sidebar / table.
+    Yields one page of order rows; the router collects and validates the
+    whole page before responding.
+    The page is bounded by `page_size`, so it is fetched with a single
+    `.get()` rather than iterating a `.stream()` cursor doc by doc.
     Each item includes a `color_code` matching the UI chip.
     """
     if firebase_service.mock_mode:
-        return _mock_order_list(status)
+        yield from _mock_order_list(status, page_size, cursor)
+        return
 
     db = firebase_service.db
-    query = db.collection(ORDERS_COLLECTION)
+    query = db.collection(ORDERS_COLLECTION).select(_ORDER_LIST_FIELDS)
 
     if status:
         query = query.where("status", "==", status)
@@ -247,28 +577,19 @@ async def list_orders(
     if date_to:
         query = query.where("timestamps.created_at", "<=", date_to)
 
-    query = query.order_by("timestamps.created_at", direction="DESCENDING")
-    docs = query.stream()
+    query = (
+        query.order_by("timestamps.created_at", direction="DESCENDING")
+        .order_by("__name__", direction="DESCENDING")
+    )
+    if cursor:
+        created_at, order_id = decode_order_cursor(cursor)
+        query = query.start_after({"timestamps.created_at": created_at, "__name__": order_id})
+    query = query.limit(page_size)
+
+    to_row = _order_list_row
+    for doc in query.get():
+        yield to_row(doc.id, doc.to_dict())
 
-    results: List[dict] = []
-    for doc in docs:
-        d = doc.to_dict()
-        s = d.get("status", PrescriptionStatus.NEW)
-        ts = d.get("timestamps", {})
-        results.append(
-            {
-                "id": doc.id,
-                "patient_name": d.get("patient_info", {}).get("name", "—"),
-                "status": s,
-                "color_code": STATUS_COLOR_MAP.get(s, "gray"),
-                "medication_count": len(d.get("medications", [])),
-                "created_at": _ts_to_iso(ts.get("created_at")),
-                "accepted_at": _ts_to_iso(ts.get("accepted_at")),
-                "ready_at": _ts_to_iso(ts.get("ready_at")),
-                "completed_at": _ts_to_iso(ts.get("completed_at")),
-            }
-        )
-    return results
 
 # ──────────────────────────────────────────────
 # Mock In-Memory DB (Global State)
@@ -276,57 +597,95 @@ async def list_orders(
 
 from pharmacy.mock_data import get_initial_mock_orders
 
-# Initialize mock DB with fresh data on module load
-_MOCK_ORDERS_DB = get_initial_mock_orders()
+# Initialize mock DB with fresh data on module load. Only mock mode reads it,
+# so real deployments skip building the seed on cold start.
+_MOCK_ORDERS_DB = get_initial_mock_orders() if firebase_service.mock_mode else []
+# id → order dict (the same objects as in the list) for O(1) detail/status lookups
+_MOCK_ORDERS_INDEX: Dict[str, dict] = {o["id"]: o for o in _MOCK_ORDERS_DB}
 
-def _mock_order_list(status_filter: Optional[str] = None) -> List[dict]:
-    """Seed data for local development."""
-    # Add color codes dynamically if not present
-    results = []
-    for o in _MOCK_ORDERS_DB:
-        # Shallow copy to avoid mutating global state unnecessarily in read operations
-        order = o.copy()
-        order["color_code"] = STATUS_COLOR_MAP.get(order["status"], "gray") 
-        # Calculate medication count if not present
-        if "medication_count" not in order:
-            order["medication_count"] = len(order.get("medications", []))
-        
-        # Flatten patient name for list view
-        if "patient_name" not in order:
-             order["patient_name"] = order.get("patient_info", {}).get("name", "Unknown")
-
-        if status_filter:
-            if order["status"] == status_filter:
-                results.append(order)
-        else:
-            results.append(order)
-            
-    # Sort by created_at desc
-    results.sort(key=lambda x: x["timestamps"]["created_at"] or "", reverse=True)
-    return results
+# Mock twin of the `pharmacy_stats/today` counters doc, so the mock dashboard
+# reads counters instead of scanning and parsing every order
+_MOCK_STATS: dict = {"in_progress": 0, "new_by_day": Counter(), "completed_by_day": Counter()}
 
 
-# ──────────────────────────────────────────────
-# 3.  Order Detail
-# ──────────────────────────────────────────────
+def _mock_count_order(order: dict, delta: int) -> None:
+    """Add (delta=1) or remove (delta=-1) `order`'s contribution to _MOCK_STATS."""
+    status = order.get("status")
+    ts = order.get("timestamps", {})
+    if status == PrescriptionStatus.NEW:
+        day = _day_key(ts.get("created_at"))
+        if day:
+            _MOCK_STATS["new_by_day"][day] += delta
+    elif status in _IN_PROGRESS:
+        _MOCK_STATS["in_progress"] += delta
+    elif status in _COMPLETED:
+        day = _day_key(ts.get("completed_at"))
+        if day:
+            _MOCK_STATS["completed_by_day"][day] += delta
 
-async def get_order_detail(order_id: str) -> Optional[dict]:
-    """Full order document with patient & doctor cards."""
-    if firebase_service.mock_mode:
-        return _mock_order_detail(order_id)
 
-    db = firebase_service.db
-    doc = db.collection(ORDERS_COLLECTION).document(order_id).get()
-    if not doc.exists:
+# Parsed (naive UTC) timestamps per mock order id, so mock reports compare
+# datetimes instead of re-parsing ISO strings on every request
+_MOCK_ORDER_TIMES: Dict[str, Dict[str, Optional[datetime]]] = {}
+
+
+def _parse_mock_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
         return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+for _order in _MOCK_ORDERS_DB:
+    _mock_count_order(_order, 1)
+    _MOCK_ORDER_TIMES[_order["id"]] = {
+        k: _parse_mock_ts(v) for k, v in _order["timestamps"].items()
+    }
+del _order
+
+def _mock_order_list(
+    status_filter: Optional[str] = None,
+    page_size: int = ORDER_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> List[dict]:
+    """Seed data for local development, paged like the Firestore query."""
+    # Filter, sort and page the raw orders first; only the returned page is
+    # shaped into rows.
+    orders = (
+        _MOCK_ORDERS_DB if not status_filter
+        else [o for o in _MOCK_ORDERS_DB if o["status"] == status_filter]
+    )
+
+    # Same (created_at, id) DESC key as the Firestore query, from pre-parsed times
+    times_get = _MOCK_ORDER_TIMES.get
+    no_times: dict = {}
+
+    def page_key(o: dict) -> tuple:
+        oid = o["id"]
+        return (times_get(oid, no_times).get("created_at") or datetime.min, oid)
+
+    orders = sorted(orders, key=page_key, reverse=True)
+    if cursor:
+        created_at, order_id = decode_order_cursor(cursor)
+        after = (created_at.replace(tzinfo=None), order_id)
+        orders = [o for o in orders if page_key(o) < after]
+
+    to_row = _order_list_row
+    return [to_row(o["id"], o) for o in orders[:page_size]]
 
-    d = doc.to_dict()
+
+# ──────────────────────────────────────────────
+# 3.  Order Detail
+# ──────────────────────────────────────────────
+
+def _order_detail(order_id: str, d: dict) -> dict:
+    """Flatten a stored order into an ``OrderDetailResponse``-compatible dict."""
     ts = d.get("timestamps", {})
     pi = d.get("patient_info", {})
     di = d.get("doctor_info", {})
+    status = d.get("status", PrescriptionStatus.NEW)
 
     return {
-        "id": doc.id,
+        "id": order_id,
         "patient_name": pi.get("name"),
         "patient_age": pi.get("age"),
         "patient_gender": pi.get("gender"),
@@ -334,54 +693,109 @@ async def get_order_detail(order_id: str) -> Optional[dict]:
         "doctor_name": di.get("name"),
         "doctor_registration_id": di.get("registration_id"),
         "medications": d.get("medications", []),
-        "status": d.get("status", PrescriptionStatus.NEW),
-        "color_code": STATUS_COLOR_MAP.get(d.get("status", PrescriptionStatus.NEW), "gray"),
+        "status": status,
+        "color_code": _color_for(status, "gray"),
         "delivery_mode": d.get("delivery_mode", DeliveryMode.STORE_PICKUP),
-        "created_at": _ts_to_iso(ts.get("created_at")),
-        "accepted_at": _ts_to_iso(ts.get("accepted_at")),
-        "ready_at": _ts_to_iso(ts.get("ready_at")),
-        "completed_at": _ts_to_iso(ts.get("completed_at")),
+        "created_at": ts.get("created_at"),
+        "accepted_at": ts.get("accepted_at"),
+        "ready_at": ts.get("ready_at"),
+        "completed_at": ts.get("completed_at"),
     }
 
 
+# Pharmacists click back into the same order repeatedly. Details are cached
+# briefly, a little longer once the order is terminal. The cache is per
+# worker and a write only invalidates its own worker's copy, so the TTLs
+# bound how long other workers can serve a stale status (cf. STATS_TTL).
+ORDER_DETAIL_TTL = 10
+TERMINAL_ORDER_DETAIL_TTL = STATS_TTL
+_TERMINAL_STATUSES = _COMPLETED | {PrescriptionStatus.REJECTED}
+_order_detail_cache = TTLCache(maxsize=1024, ttl=ORDER_DETAIL_TTL)
+
+
+def invalidate_order_detail(order_id: str) -> None:
+    """Drop the cached detail for `order_id` (call after any write to the order)."""
+    _order_detail_cache.pop(order_id, None)
+
+
+async def get_order_detail(order_id: str, fresh: bool = False) -> Optional[dict]:
+    """
+    Full order document with patient & doctor cards. `fresh` skips the
+    cached copy, for callers that act on the current status.
+    """
+    if firebase_service.mock_mode:
+        return _mock_order_detail(order_id)
+
+    if not fresh:
+        cached = _order_detail_cache.get(order_id)
+        if cached is not None:
+            return cached
+
+    db = firebase_service.db
+    doc = await run_blocking(db.collection(ORDERS_COLLECTION).document(order_id).get)
+    if not doc.exists:
+        return None
+
+    detail = _order_detail(doc.id, doc.to_dict())
+    ttl = TERMINAL_ORDER_DETAIL_TTL if detail["status"] in _TERMINAL_STATUSES else None
+    _order_detail_cache.set(order_id, detail, ttl=ttl)
+    return detail
+
+
+async def get_orders_by_ids(ids: List[str]) -> List[dict]:
+    """
+    Order details for several ids in one batched `get_all` read instead of
+    N document reads. Unknown ids are skipped; results follow `ids` order.
+    """
+    unique = list(dict.fromkeys(ids))
+    if firebase_service.mock_mode:
+        return [d for d in map(_mock_order_detail, unique) if d is not None]
+    if not unique:
+        return []
+
+    db = firebase_service.db
+    orders = db.collection(ORDERS_COLLECTION)
+    refs = [orders.document(order_id) for order_id in unique]
+    docs = await run_blocking(lambda: list(db.get_all(refs)))
+
+    found = {doc.id: doc for doc in docs if doc.exists}
+    return [
+        _order_detail(order_id, found[order_id].to_dict())
+        for order_id in unique
+        if order_id in found
+    ]
+
+
 def _mock_order_detail(order_id: str) -> Optional[dict]:
-    for order in _MOCK_ORDERS_DB:
-        if order["id"] == order_id:
-            # Flatten structure to match response schema
-            d = order.copy()
-            pi = d.get("patient_info", {})
-            di = d.get("doctor_info", {})
-            ts = d.get("timestamps", {})
-            
-            return {
-                "id": d["id"],
-                "patient_name": pi.get("name"),
-                "patient_age": pi.get("age"),
-                "patient_gender": pi.get("gender"),
-                "patient_contact_id": pi.get("contact_id"),
-                "doctor_name": di.get("name"),
-                "doctor_registration_id": di.get("registration_id"),
-                "medications": d.get("medications", []),
-                "status": d.get("status"),
-                "color_code": STATUS_COLOR_MAP.get(d.get("status"), "gray"),
-                "delivery_mode": d.get("delivery_mode", DeliveryMode.STORE_PICKUP),
-                "created_at": ts.get("created_at"),
-                "accepted_at": ts.get("accepted_at"),
-                "ready_at": ts.get("ready_at"),
-                "completed_at": ts.get("completed_at"),
-            }
-    return None
+    order = _MOCK_ORDERS_INDEX.get(order_id)
+    if order is None:
+        return None
+    return _order_detail(order["id"], order)
 
 
 # ──────────────────────────────────────────────
 # 4.  Status Transition + Side-effects
 # ──────────────────────────────────────────────
 
-async def update_order_status(order_id: str, new_status: str) -> dict:
+# Which `timestamps.*` field a transition stamps; statuses not listed stamp none
+_STATUS_TIMESTAMP_FIELD = {
+    PrescriptionStatus.ACCEPTED: "accepted_at",
+    PrescriptionStatus.READY: "ready_at",
+    PrescriptionStatus.DELIVERED: "completed_at",
+    PrescriptionStatus.PICKED_UP: "completed_at",
+}
+
+
+async def update_order_status(
+    order_id: str,
+    new_status: str,
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> dict:
     """
     Advance an order's status.
     Side-effects:
-      - READY   → trigger patient notification
+      - READY   → trigger patient notification (queued on `background_tasks`
+                  when given, so the response does not wait on FCM / SMS)
       - DELIVERED / PICKED_UP → stamp completed_at
     """
     if firebase_service.mock_mode:
@@ -389,30 +803,48 @@ async def update_order_status(order_id: str, new_status: str) -> dict:
 
     db = firebase_service.db
     doc_ref = db.collection(ORDERS_COLLECTION).document(order_id)
-    doc = doc_ref.get()
-    if not doc.exists:
-        return None
 
     update_payload: dict = {"status": new_status}
+    # Stamped by Firestore at commit time; `now` is only for the counter
+    # day bucket and the response body.
     now = _now()
 
-    if new_status == PrescriptionStatus.ACCEPTED:
-        update_payload["timestamps.accepted_at"] = now
-
-    if new_status == PrescriptionStatus.READY:
-        update_payload["timestamps.ready_at"] = now
-        _notify_patient_ready(doc.to_dict())
-
-    if new_status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
-        update_payload["timestamps.completed_at"] = now
+    field = _STATUS_TIMESTAMP_FIELD.get(new_status)
+    if field:
+        update_payload[f"timestamps.{field}"] = firestore.SERVER_TIMESTAMP
+
+    # Order + counter buckets move together; the transaction re-reads the
+    # order so concurrent transitions cannot double-count.
+    @firestore.transactional
+    def _apply(transaction) -> Optional[dict]:
+        doc = doc_ref.get(transaction=transaction)
+        if not doc.exists:
+            return None
+        order = doc.to_dict()
+        transaction.update(doc_ref, update_payload)
+        deltas = _status_change_deltas(order, new_status, now)
+        if deltas:
+            transaction.set(_stats_ref(db), deltas, merge=True)
+        return order
+
+    order = await run_blocking(_apply, db.transaction())
+    if order is None:
+        return None
+    invalidate_order_detail(order_id)
+    invalidate_dashboard_stats()
 
-    doc_ref.update(update_payload)
+    side_effect = _STATUS_SIDE_EFFECT.get(new_status)
+    if side_effect:
+        if background_tasks is not None:
+            background_tasks.add_task(side_effect, order)
+        else:
+            side_effect(order)
 
     return {
         "id": order_id,
         "status": new_status,
         "color_code": STATUS_COLOR_MAP.get(new_status, "gray"),
-        "updated_at": _ts_to_iso(now),
+        "updated_at": _dt_iso(now),
     }
 
 
@@ -420,32 +852,39 @@ def _mock_status_update(order_id: str, new_status: str) -> Optional[dict]:
     print(f"[MOCK] Order {order_id} → {new_status}")
     
     # Update global mock DB
-    for order in _MOCK_ORDERS_DB:
-        if order["id"] == order_id:
-            order["status"] = new_status
-            ts = order["timestamps"]
-            now_iso = _ts_to_iso(_now())
-            
-            if new_status == PrescriptionStatus.ACCEPTED:
-                ts["accepted_at"] = now_iso
-            elif new_status == PrescriptionStatus.READY:
-                ts["ready_at"] = now_iso
-            elif new_status in (PrescriptionStatus.DELIVERED, PrescriptionStatus.PICKED_UP):
-                ts["completed_at"] = now_iso
-                
-            return {
-                "id": order_id,
-                "status": new_status,
-                "color_code": STATUS_COLOR_MAP.get(new_status, "gray"),
-                "updated_at": now_iso,
-            }
-    return None
+    order = _MOCK_ORDERS_INDEX.get(order_id)
+    if order is None:
+        return None
+
+    _mock_count_order(order, -1)
+    order["status"] = new_status
+    ts = order["timestamps"]
+    now = _now()
+    now_iso = _dt_iso(now)
+
+    field = _STATUS_TIMESTAMP_FIELD.get(new_status)
+    if field:
+        ts[field] = now_iso
+        _MOCK_ORDER_TIMES.setdefault(order_id, {})[field] = now
+    _mock_count_order(order, 1)
+
+    return {
+        "id": order_id,
+        "status": new_status,
+        "color_code": STATUS_COLOR_MAP.get(new_status, "gray"),
+        "updated_at": now_iso,
+    }
 
 
 # ──────────────────────────────────────────────
 # 5.  Create Order  (called by agent or doctor flow)
 # ──────────────────────────────────────────────
 
+def new_order_id() -> str:
+    """'RX-' plus 8 random uppercase hex chars, straight from the OS RNG."""
+    return f"RX-{secrets.token_hex(4).upper()}"
+
+
 async def create_order(
     patient_name: str,
     patient_age: int,
@@ -457,7 +896,7 @@ async def create_order(
     delivery_mode: str = DeliveryMode.STORE_PICKUP,
 ) -> dict:
     """Persist a new PharmacyOrder and return the created document."""
-    order_id = f"RX-{uuid.uuid4().hex[:8].upper()}"
+    order_id = new_order_id()
     now = _now()
 
     order_data = {
@@ -473,10 +912,13 @@ async def create_order(
             "registration_id": doctor_registration_id,
         },
         "medications": medications,
+        # Denormalized scalars read by the order list projection
+        "patient_name": patient_name,
+        "medication_count": len(medications),
         "status": PrescriptionStatus.NEW,
         "delivery_mode": delivery_mode,
         "timestamps": {
-            "created_at": _ts_to_iso(now),
+            "created_at": _dt_iso(now),
             "accepted_at": None,
             "ready_at": None,
             "completed_at": None,
@@ -486,17 +928,23 @@ async def create_order(
     if firebase_service.mock_mode:
         print(f"[MOCK] Created pharmacy order {order_id}")
         _MOCK_ORDERS_DB.insert(0, order_data) # Add to mock DB
+        _MOCK_ORDERS_INDEX[order_id] = order_data
+        _mock_count_order(order_data, 1)
+        _MOCK_ORDER_TIMES[order_id] = {"created_at": now}
         return order_data
 
     db = firebase_service.db
     # Remove 'id' if you don't want it stored in the doc body, but it's often useful
-    store_data = order_data.copy() 
+    store_data = order_data.copy()
     store_data.pop("id")
-    # Convert string timestamps back to datetime for Firestore if needed, 
-    # but for now reusing the logic as is.
-    store_data["timestamps"]["created_at"] = now 
-    
-    db.collection(ORDERS_COLLECTION).document(order_id).set(store_data)
+    # The stored created_at comes from the server clock; `now` only feeds the response
+    store_data["timestamps"] = {**order_data["timestamps"], "created_at": firestore.SERVER_TIMESTAMP}
+
+    batch = db.batch()
+    batch.set(db.collection(ORDERS_COLLECTION).document(order_id), store_data)
+    record_orders_created(batch, 1)
+    await run_blocking(batch.commit)
+    invalidate_dashboard_stats()
     return order_data
 
 
@@ -514,3 +962,9 @@ def _notify_patient_ready(order_data: dict) -> None:
     name = patient.get("name", "Patient")
     contact = patient.get("contact_id", "N/A")
     print(f"[NOTIFICATION] 📦 Prescription READY for {name} (contact: {contact})")
+
+
+# Post-commit hooks per target status, run with the pre-update order dict
+_STATUS_SIDE_EFFECT = {
+    PrescriptionStatus.READY: _notify_patient_ready,
+}
@@ -56,6 +56,9 @@ from app.services.delivery_route import (
 
 router = APIRouter(prefix="/pharmacy/v2", tags=["Pharmacy V2 – Agentic"])
 
+# Transitions that require every medication to be in stock first
+_STOCK_CHECKED_STATUSES = (PrescriptionStatus.ACCEPTED, PrescriptionStatus.PREPARING)
+
 
 # ══════════════════════════════════════════════
 #  REQUEST / RESPONSE SCHEMAS (V2)
@@ -180,8 +183,9 @@ async def agentic_status_update(
 
     Returns 400 if stock validation fails during ACCEPTED transition.
     """
-    # Get current order status
-    detail = await order_service.get_order_detail(order_id)
+    # Get current order status; bypass the per-worker detail cache, since
+    # another worker may have moved the order since it was cached here
+    detail = await order_service.get_order_detail(order_id, fresh=True)
     if detail is None:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
 
@@ -189,7 +193,7 @@ async def agentic_status_update(
     new_status = body.status
 
     # ── ACCEPTED transition: validate + decrement stock ──
-    if new_status in (PrescriptionStatus.ACCEPTED, PrescriptionStatus.PREPARING):
+    if new_status in _STOCK_CHECKED_STATUSES:
         is_valid, missing = await validate_stock_for_order(order_id)
         if not is_valid:
             raise HTTPException(
@@ -206,7 +210,9 @@ async def agentic_status_update(
             background_tasks.add_task(_run_stock_decrement, order_id)
 
     # Perform the actual status update
-    result = await order_service.update_order_status(order_id, new_status)
+    result = await order_service.update_order_status(
+        order_id, new_status, background_tasks=background_tasks
+    )
     if result is None:
         raise HTTPException(status_code=404, detail=f"Order {order_id} not found")
 
@@ -332,6 +338,7 @@ async def run_expiry_cleanup(background_tasks: BackgroundTasks):
     This is the **Batch Processing & Expiry Agent** endpoint.
     """
     result = await cleanup_expiring_inventory()
+    order_service.invalidate_dashboard_stats()
     return result
 
 
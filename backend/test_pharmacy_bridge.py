@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+# firebase_admin is stubbed in conftest.py before this import
+from pharmacy.router import _age_from_dob, _build_bridge_order
+from pharmacy.schemas import CreateOrderBridgeRequest
+
+_THIS_YEAR = datetime.utcnow().year
+
+
+@pytest.mark.parametrize(
+    "dob,expected",
+    [
+        ("1990", _THIS_YEAR - 1990),
+        ("17/05/1990", 0),
+        ("", 0),
+    ],
+    ids=["year-only", "malformed", "empty"],
+)
+def test_age_from_dob_tolerates_bad_input(dob, expected):
+    assert _age_from_dob(dob) == expected
+
+
+def test_bridge_order_with_bad_dob_still_builds():
+    req = CreateOrderBridgeRequest(
+        case_id="c", profile_id="p", pharmacy_id="ph", items=[{"drug_name": "x"}], location="L"
+    )
+    order = _build_bridge_order(req, {"full_name": "Asha", "dob": "17/05/1990"})
+    assert (order["patient_name"], order["patient_info"]["age"]) == ("Asha", 0)
@@ -1,119 +1,166 @@
-
-import sys
-import os
-import unittest
-from unittest.mock import MagicMock, patch, AsyncMock
-from fastapi.testclient import TestClient
-from fastapi import FastAPI
-
-# Add backend to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-# Mock firebase_admin modules BEFORE importing app components that use them
-sys.modules["firebase_admin"] = MagicMock()
-sys.modules["firebase_admin.auth"] = MagicMock()
-sys.modules["firebase_admin.firestore"] = MagicMock()
-
-# Import the router and necessary models
-from app.routers import pharmacy_v2
-from app.pharmacy.models import PrescriptionStatus
-
-class TestPharmacyV2Endpoint(unittest.TestCase):
-    def setUp(self):
-        # Create a clean FastAPI app for testing just this router
-        self.app = FastAPI()
-        self.app.include_router(pharmacy_v2.router)
-        self.client = TestClient(self.app)
-
-    @patch("app.routers.pharmacy_v2.validate_stock_for_order", new_callable=AsyncMock)
-    def test_validate_stock_success(self, mock_validate):
-        # Setup mock
-        mock_validate.return_value = (True, [])
-
-        response = self.client.get("/pharmacy/v2/orders/ord-123/validate-stock")
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertTrue(data["is_valid"])
-        self.assertEqual(data["order_id"], "ord-123")
-        self.assertEqual(data["missing_items"], [])
-
-    @patch("app.routers.pharmacy_v2.validate_stock_for_order", new_callable=AsyncMock)
-    def test_validate_stock_failure(self, mock_validate):
-        # Setup mock for failure
-        mock_validate.return_value = (False, [{"name": "Aspirin", "needed": 10, "available": 5}])
-
-        response = self.client.get("/pharmacy/v2/orders/ord-123/validate-stock")
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertFalse(data["is_valid"])
-        self.assertEqual(len(data["missing_items"]), 1)
-        self.assertEqual(data["missing_items"][0]["name"], "Aspirin")
-
-    @patch("app.routers.pharmacy_v2.generate_prescription_hash")
-    def test_sign_prescription(self, mock_hash):
-        mock_hash.return_value = "hashed_value_123"
-        
-        payload = {
-            "doctor_id": "doc-001",
-            "medications": [{"name": "Meds", "qty": 1}],
-            "created_at": "2023-01-01T12:00:00Z"
-        }
-        
-        response = self.client.post("/pharmacy/v2/prescriptions/sign", json=payload)
-        
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
-        self.assertEqual(data["prescription_hash"], "hashed_value_123")
-        self.assertEqual(data["doctor_id"], "doc-001")
-
-    @patch("app.routers.pharmacy_v2.order_service.get_order_detail", new_callable=AsyncMock)
-    @patch("app.routers.pharmacy_v2.order_service.update_order_status", new_callable=AsyncMock)
-    @patch("app.routers.pharmacy_v2.log_status_change", new_callable=AsyncMock)
-
-    def test_agentic_status_update_basic(self, mock_log, mock_update, mock_get):
-        # Test simple transition (e.g. PREPARING -> READY) which doesn't check stock
-        mock_get.return_value = {"order_id": "ord-123", "status": PrescriptionStatus.PREPARING}
-        mock_update.return_value = {
-            "id": "ord-123", 
-            "status": PrescriptionStatus.READY,
-            "color_code": "green"
-        }
-
-        payload = {
-            "status": PrescriptionStatus.READY,
-            "actor_id": "pharmacist-1"
-        }
-        
-        response = self.client.patch("/pharmacy/v2/orders/ord-123/status", json=payload)
-        
-        self.assertEqual(response.status_code, 200)
-        mock_update.assert_called_with("ord-123", PrescriptionStatus.READY)
-        # Background tasks might not execute immediately in TestClient unless using BackgroundTasks logic, 
-        # but in Starlette TestClient, they are usually collected.
-        # We verify that update was called.
-
-    @patch("app.routers.pharmacy_v2.order_service.get_order_detail", new_callable=AsyncMock)
-    @patch("app.routers.pharmacy_v2.validate_stock_for_order", new_callable=AsyncMock)
-    def test_agentic_status_update_insufficient_stock(self, mock_validate, mock_get):
-        # Test NEW -> ACCEPTED where stock is missing
-        mock_get.return_value = {"order_id": "ord-123", "status": PrescriptionStatus.NEW}
-        mock_validate.return_value = (False, [{"name": "Meds", "error": "None"}])
-
-        payload = {
-            "status": PrescriptionStatus.ACCEPTED,
-            "actor_id": "pharmacist-1"
-        }
-        
-        response = self.client.patch("/pharmacy/v2/orders/ord-123/status", json=payload)
-        
-        self.assertEqual(response.status_code, 400)
-        self.assertEqual(response.json()["detail"]["error"], "INSUFFICIENT_STOCK")
-
-
-
-if __name__ == "__main__":
-    import io
-    runner = unittest.TextTestRunner(stream=open("test_run_utf8.log", "w", encoding="utf-8"), verbosity=2)
-    unittest.main(testRunner=runner, exit=False)
+import json
+from unittest.mock import ANY, MagicMock, patch
+
+import pytest
+
+# firebase_admin is stubbed in conftest.py before this import
+import pharmacy_v2
+from pharmacy.models import PrescriptionStatus
+
+pytestmark = pytest.mark.anyio
+
+_NEW, _ACCEPTED, _PREPARING, _READY = (
+    PrescriptionStatus.NEW,
+    PrescriptionStatus.ACCEPTED,
+    PrescriptionStatus.PREPARING,
+    PrescriptionStatus.READY,
+)
+
+# get_order_detail returns a plain dict that the router only reads, so the
+# stand-in return values are built once and shared
+_ORD_NEW = {"order_id": "ord-123", "status": _NEW}
+_ORD_PREPARING = {"order_id": "ord-123", "status": _PREPARING}
+_UPDATED_READY = {"id": "ord-123", "status": _READY, "color_code": "green"}
+
+_BASE = "/pharmacy/v2"
+_STATUS_URL = f"{_BASE}/orders/ord-123/status"
+
+# Request bodies are fixed, so they are encoded once and sent as raw content.
+# The status-update tests go over HTTP to keep routing / serialization covered.
+_JSON_HEADERS = {"content-type": "application/json"}
+_SIGN_BODY = json.dumps({
+    "doctor_id": "doc-001",
+    "medications": [{"name": "Meds", "qty": 1}],
+    "created_at": "2023-01-01T12:00:00Z"
+}).encode()
+_STATUS_BODY = {
+    target: json.dumps({"status": target.value, "actor_id": "pharmacist-1"}).encode()
+    for target in (_ACCEPTED, _READY)
+}
+
+
+class FastAsyncMock:
+    """
+    Bare awaitable stand-in: remembers the last call and returns
+    ``return_value``, or applies ``side_effect`` (an exception to raise or a
+    callable to delegate to) like AsyncMock. Covers only the AsyncMock
+    surface these tests use.
+    """
+    __slots__ = ("return_value", "side_effect", "called", "args", "kwargs")
+
+    def __init__(self, return_value=None, side_effect=None):
+        self.return_value = return_value
+        self.side_effect = side_effect
+        self.reset_mock()
+
+    async def __call__(self, *args, **kwargs):
+        self.called = True
+        self.args, self.kwargs = args, kwargs
+        effect = self.side_effect
+        if effect is None:
+            return self.return_value
+        if isinstance(effect, BaseException) or (
+            isinstance(effect, type) and issubclass(effect, BaseException)
+        ):
+            raise effect
+        return effect(*args, **kwargs)
+
+    def assert_called_with(self, *args, **kwargs):
+        assert self.called and (self.args, self.kwargs) == (args, kwargs)
+
+    def reset_mock(self, return_value=False, side_effect=False):
+        self.called = False
+        self.args, self.kwargs = (), {}
+        if return_value:
+            self.return_value = None
+        if side_effect:
+            self.side_effect = None
+
+
+@pytest.fixture(scope="module")
+def pv2_mocks():
+    # Router collaborators are patched once for the module; tests set return values
+    router_mocks = {
+        "validate_stock_for_order": FastAsyncMock(),
+        "generate_prescription_hash": MagicMock(),
+        "log_status_change": FastAsyncMock(),
+    }
+    service_mocks = {
+        "get_order_detail": FastAsyncMock(),
+        "update_order_status": FastAsyncMock(),
+    }
+    with patch.multiple("pharmacy_v2", **router_mocks), \
+            patch.multiple("pharmacy_v2.order_service", **service_mocks):
+        yield {**router_mocks, **service_mocks}
+
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(pv2_mocks):
+    for mock in pv2_mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+_ASPIRIN_SHORT = {"name": "Aspirin", "needed": 10, "available": 5}
+
+
+@pytest.mark.parametrize(
+    "mock_ret,is_valid,missing",
+    [
+        ((True, []), True, []),
+        ((False, [_ASPIRIN_SHORT]), False, [_ASPIRIN_SHORT]),
+    ],
+    ids=["in-stock", "short"],
+)
+async def test_validate_stock(mock_ret, is_valid, missing, pv2_mocks):
+    # Pure view logic: call the route coroutine directly, no ASGI round trip
+    pv2_mocks["validate_stock_for_order"].return_value = mock_ret
+
+    data = await pharmacy_v2.validate_stock_endpoint("ord-123")
+
+    assert (data.is_valid, data.order_id, data.missing_items) == (is_valid, "ord-123", missing)
+
+
+async def test_sign_prescription(pv2_mocks):
+    pv2_mocks["generate_prescription_hash"].return_value = "hashed_value_123"
+
+    data = await pharmacy_v2.sign_prescription(
+        pharmacy_v2.PrescriptionSignRequest.model_validate_json(_SIGN_BODY)
+    )
+
+    assert (data.prescription_hash, data.doctor_id) == ("hashed_value_123", "doc-001")
+
+
+async def test_agentic_status_update_basic(pv2_client, pv2_mocks):
+    # Test simple transition (e.g. PREPARING -> READY) which doesn't check stock
+    mock_update = pv2_mocks["update_order_status"]
+    pv2_mocks["get_order_detail"].return_value = _ORD_PREPARING
+    mock_update.return_value = _UPDATED_READY
+
+    response = await pv2_client.patch(
+        _STATUS_URL, content=_STATUS_BODY[_READY], headers=_JSON_HEADERS
+    )
+
+    assert response.status_code == 200
+    # The transition is decided on an uncached read of the current status
+    pv2_mocks["get_order_detail"].assert_called_with("ord-123", fresh=True)
+    mock_update.assert_called_with(
+        "ord-123", _READY, background_tasks=ANY
+    )
+    # ASGITransport awaits the whole app call, so queued background tasks
+    # (the timeline log) have already run by the time the response returns
+    pv2_mocks["log_status_change"].assert_called_with(
+        "ord-123", _PREPARING, _READY, "pharmacist-1"
+    )
+
+
+async def test_agentic_status_update_insufficient_stock(pv2_client, pv2_mocks):
+    # Test NEW -> ACCEPTED where stock is missing
+    pv2_mocks["get_order_detail"].return_value = _ORD_NEW
+    pv2_mocks["validate_stock_for_order"].return_value = (False, [{"name": "Meds", "error": "None"}])
+
+    response = await pv2_client.patch(
+        _STATUS_URL, content=_STATUS_BODY[_ACCEPTED], headers=_JSON_HEADERS
+    )
+
+    data = response.json()
+    assert (response.status_code, data["detail"]["error"]) == (400, "INSUFFICIENT_STOCK")
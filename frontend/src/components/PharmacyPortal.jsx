@@ -29,12 +29,25 @@ const fetchStats = async () => {
     }
 };
 
+// Largest page the backend accepts (MAX_ORDER_PAGE_SIZE); fewer round trips
+const ORDER_PAGE_SIZE = 200;
+
+// Follows next_cursor until the last page so views list every matching order
 const fetchOrders = async (status = null) => {
     try {
-        const url = status ? `${API_BASE}/pharmacy/orders?status=${status}` : `${API_BASE}/pharmacy/orders`;
-        const res = await fetch(url);
-        if (!res.ok) throw new Error('Failed to fetch orders');
-        return await res.json();
+        const items = [];
+        let cursor = null;
+        do {
+            const params = new URLSearchParams({ page_size: ORDER_PAGE_SIZE });
+            if (status) params.set('status', status);
+            if (cursor) params.set('cursor', cursor);
+            const res = await fetch(`${API_BASE}/pharmacy/orders?${params}`);
+            if (!res.ok) throw new Error('Failed to fetch orders');
+            const page = await res.json();
+            items.push(...page.items);
+            cursor = page.next_cursor;
+        } while (cursor);
+        return items;
     } catch (e) {
         console.error(e);
         return [];